@@ -4,91 +4,298 @@ Parses OPML file, displays podcast episodes, allows selection, exports to CSV.
 Run with: streamlit run 1_episode_selector.py
 """
 
+import asyncio
+import json
+import aiohttp
 import streamlit as st
-import feedparser
+import fastfeedparser
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shutil
 from pathlib import Path
-import xml.etree.ElementTree as ET
+from lxml import etree
 from datetime import datetime, timedelta
 from utils import load_env_vars, sanitize_filename
 
 # Cache configuration
 CACHE_DIR = Path("episode_cache")
-CACHE_FILE = CACHE_DIR / "episodes_cache.parquet"
+CACHE_DATASET = CACHE_DIR / "episodes"  # Parquet dataset partitioned by publish month
 CACHE_META = CACHE_DIR / "cache_metadata.json"
 
+EPISODE_COLUMNS = ['podcast_name', 'episode_title', 'publish_date', 'audio_url', 'description']
 
-def parse_opml(file_path):
-    """Parse OPML file and extract podcast feeds."""
-    tree = ET.parse(file_path)
-    root = tree.getroot()
+# Concurrent fetch configuration
+MAX_CONCURRENT_FETCHES = 64
+MAX_FETCHES_PER_HOST = 4
+FETCH_TIMEOUT = 30  # seconds
 
+
+def parse_opml(source):
+    """
+    Parse OPML file (path or file-like object) and extract podcast feeds.
+    Streams the file with lxml's iterparse, which matches <outline> elements
+    (in any namespace) in C, and clears each outline once read so memory
+    stays flat on large OPML exports.
+    """
     feeds = []
-    for outline in root.iter():
-        if outline.tag.endswith('outline'):
-            attrib = outline.attrib
-            if 'xmlUrl' in attrib or 'htmlUrl' in attrib:
-                feeds.append({
-                    'title': attrib.get('text', attrib.get('title', 'Unknown')),
-                    'url': attrib.get('xmlUrl', attrib.get('htmlUrl', ''))
-                })
+    for _, outline in etree.iterparse(source, events=('end',), tag='{*}outline'):
+        attrib = outline.attrib
+        if 'xmlUrl' in attrib or 'htmlUrl' in attrib:
+            feeds.append({
+                'title': attrib.get('text', attrib.get('title', 'Unknown')),
+                'url': attrib.get('xmlUrl', attrib.get('htmlUrl', ''))
+            })
+        outline.clear()
 
     return feeds
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_episodes_cached(feed_url, max_episodes=10):
-    """Fetch recent episodes from a podcast RSS feed (cached)."""
-    try:
-        feed = feedparser.parse(feed_url)
-        episodes = []
-
-        for entry in feed.entries[:max_episodes]:
-            # Get audio URL (enclosure or media:content)
-            audio_url = ''
-            if hasattr(entry, 'enclosures') and len(entry.enclosures) > 0:
-                audio_url = entry.enclosures[0].get('href', '')
-            elif hasattr(entry, 'media_content') and len(entry.media_content) > 0:
-                audio_url = entry.media_content[0].get('url', '')
-            elif 'links' in entry:
-                for link in entry.links:
-                    if link.get('type', '').startswith('audio/'):
-                        audio_url = link.href
-                        break
-
-            # Parse publish date
-            pub_date = ''
-            if hasattr(entry, 'published_parsed'):
-                pub_date = datetime(*entry.published_parsed[:6]).strftime('%Y-%m-%d')
-            elif hasattr(entry, 'updated_parsed'):
-                pub_date = datetime(*entry.updated_parsed[:6]).strftime('%Y-%m-%d')
-
-            episodes.append({
-                'title': entry.get('title', 'No title'),
-                'pub_date': pub_date,
-                'audio_url': audio_url,
-                'description': entry.get('description', '')[:500]
-            })
+def audio_from_enclosures(entry):
+    """Get audio URL from the first <enclosure>."""
+    enclosures = entry.get('enclosures')
+    return enclosures[0].get('url', '') if enclosures else ''
+
+
+def audio_from_media(entry):
+    """Get audio URL from the first <media:content>."""
+    media_content = entry.get('media_content')
+    return media_content[0].get('url', '') if media_content else ''
+
+
+def audio_from_links(entry):
+    """Get audio URL from the first link with an audio/* type."""
+    return next((link.get('href', '') for link in entry.get('links') or ()
+                 if (link.get('type') or '').startswith('audio/')), '')
 
-        return episodes
+
+def audio_from_any(entry):
+    """Get audio URL from enclosure, media:content, or an audio link."""
+    return audio_from_enclosures(entry) or audio_from_media(entry) or audio_from_links(entry)
+
+
+def pick_audio_extractor(entry):
+    """Pick the audio URL extractor matching a feed's shape, judged by one entry."""
+    if entry.get('enclosures'):
+        return audio_from_enclosures
+    if entry.get('media_content'):
+        return audio_from_media
+    return audio_from_links
+
+
+def parse_feed(raw_feed, max_episodes=10):
+    """
+    Parse raw RSS bytes into a list of recent episodes.
+    Feeds almost always use one layout for every entry, so the audio and date
+    fields are picked from the first entry; other entries only fall back to the
+    full search when that field comes up empty.
+    """
+    try:
+        feed = fastfeedparser.parse(raw_feed, include_content=False, include_tags=False)
+        entries = feed.entries[:max_episodes]
+        if not entries:
+            return []
+
+        extract_audio = pick_audio_extractor(entries[0])
+        date_key = 'published' if entries[0].get('published') else 'updated'
+
+        return [
+            {
+                # fastfeedparser sets a missing title to ''
+                'title': entry.get('title') or 'No title',
+                # ISO 8601 string, keep the date part
+                'pub_date': (entry.get(date_key) or entry.get('published') or entry.get('updated') or '')[:10],
+                'audio_url': extract_audio(entry) or audio_from_any(entry),
+                'description': (entry.get('description') or '')[:500]
+            }
+            for entry in entries
+        ]
     except Exception as e:
         return []
 
 
-def load_cache():
-    """Load cached episodes from parquet file."""
-    if CACHE_FILE.exists():
+async def fetch_feed(session, semaphore, feed_url, validator=None):
+    """
+    Download raw RSS bytes for one feed using a conditional GET.
+    Returns (raw_feed, validator). raw_feed is None when the server reports the
+    feed unchanged (HTTP 304) and empty bytes on failure.
+    """
+    headers = {}
+    if validator:
+        if validator.get('etag'):
+            headers['If-None-Match'] = validator['etag']
+        if validator.get('last_modified'):
+            headers['If-Modified-Since'] = validator['last_modified']
+
+    async with semaphore:
         try:
-            return pd.read_parquet(CACHE_FILE)
-        except Exception:
-            return pd.DataFrame()
-    return pd.DataFrame()
+            async with session.get(feed_url, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT)) as response:
+                if response.status == 304:
+                    return None, validator
+                response.raise_for_status()
+                raw_feed = await response.read()
+                return raw_feed, {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return b'', None
+
+
+async def fetch_all(feed_urls, max_episodes=10, validators=None):
+    """
+    Fetch all feeds concurrently and parse them as they arrive.
+    Parsing runs in worker threads so it overlaps with the remaining downloads.
+    Unchanged feeds (HTTP 304) are skipped entirely since their episodes are already cached.
+    Returns (episode lists in feed order, updated validators keyed by feed URL).
+    A validator is only kept for feeds that parsed into episodes, so a feed that
+    failed to parse is fetched in full again next time.
+    """
+    validators = dict(validators or {})
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_FETCHES, limit_per_host=MAX_FETCHES_PER_HOST)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    # RSS is highly compressible; ask for gzip/brotli and let aiohttp decompress in memory
+    headers = {'Accept-Encoding': 'gzip, deflate, br'}
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers, auto_decompress=True) as session:
+        async def fetch_and_parse(feed_url):
+            validator = validators.get(feed_url)
+            # Cached episodes only cover the episode count they were fetched with
+            if validator and validator.get('max_episodes', 0) < max_episodes:
+                validator = None
+
+            raw_feed, validator = await fetch_feed(session, semaphore, feed_url, validator)
+            if raw_feed is None:
+                return []
+            if not raw_feed:
+                validators.pop(feed_url, None)
+                return []
+
+            episodes = await asyncio.to_thread(parse_feed, raw_feed, max_episodes)
+            if episodes:
+                validators[feed_url] = {**validator, 'max_episodes': max_episodes}
+            else:
+                validators.pop(feed_url, None)
+            return episodes
+
+        results = await asyncio.gather(*(fetch_and_parse(url) for url in feed_urls))
+
+    return results, validators
+
+
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)  # Cache for 1 hour
+def fetch_episodes_cached(feed_urls, max_episodes=10):
+    """
+    Fetch recent episodes from all podcast RSS feeds concurrently (cached).
+    Feeds unchanged since the last fetch return no episodes; they are served from the parquet cache.
+    Returns (episode lists, validators). The caller saves the validators once the
+    episodes are in the parquet cache, since a 304 is only safe if they are.
+    """
+    validators = load_feed_validators() if CACHE_DATASET.exists() else {}
+    return asyncio.run(fetch_all(list(feed_urls), max_episodes, validators))
+
+
+def load_feed_validators():
+    """Load per-feed ETag/Last-Modified validators from cache metadata."""
+    if CACHE_META.exists():
+        try:
+            return json.loads(CACHE_META.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+    return {}
 
 
-def save_cache(df):
-    """Save episodes to parquet cache."""
+def save_feed_validators(validators):
+    """Save per-feed ETag/Last-Modified validators to cache metadata."""
     CACHE_DIR.mkdir(exist_ok=True)
-    df.to_parquet(CACHE_FILE, index=False)
+    CACHE_META.write_text(json.dumps(validators, indent=2), encoding='utf-8')
+
+
+def cache_files():
+    """List the parquet files that make up the episode cache."""
+    if CACHE_DATASET.exists():
+        return list(CACHE_DATASET.rglob('*.parquet'))
+    return []
+
+
+def load_cache():
+    """Load cached episodes from the parquet dataset."""
+    files = cache_files()
+    if files:
+        return read_cache_dataset(len(files), max(f.stat().st_mtime_ns for f in files))
+    return pd.DataFrame()
+
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def read_cache_dataset(file_count, mtime_ns):
+    """
+    Read the parquet cache (cached).
+    Keyed on the file count and newest mtime, so reruns only re-read it after a save.
+    """
+    try:
+        return pd.read_parquet(CACHE_DATASET).drop(columns='publish_month')
+    except Exception:
+        return pd.DataFrame()
+
+
+def publish_months(df):
+    """Cache partition (YYYY-MM, or 'unknown') for each episode."""
+    return df['publish_date'].fillna('').str[:7].replace('', 'unknown')
+
+
+def save_cache(new_df, existing_data_behavior='overwrite_or_ignore'):
+    """
+    Append new episodes to the parquet cache.
+    Only the new rows are written (zstd-compressed), into one partition per publish month.
+    update_cache passes 'delete_matching' to replace the partitions it writes instead.
+    """
+    table = pa.Table.from_pandas(new_df.assign(publish_month=publish_months(new_df)), preserve_index=False)
+    pq.write_to_dataset(table, root_path=CACHE_DATASET, partition_cols=['publish_month'],
+                        compression='zstd', compression_level=3,
+                        existing_data_behavior=existing_data_behavior)
+
+
+def changed_episodes(fetched_df, cached_df):
+    """Return fetched episodes that are already cached under the same audio URL but with different fields."""
+    if cached_df.empty:
+        return fetched_df.iloc[:0]
+    fields = [col for col in EPISODE_COLUMNS if col != 'audio_url']
+    merged = fetched_df.merge(cached_df.drop_duplicates('audio_url', keep='last'),
+                              on='audio_url', suffixes=('', '_cached'))
+    fresh = merged[fields].fillna('').to_numpy()
+    cached = merged[[f"{col}_cached" for col in fields]].fillna('').to_numpy()
+    return merged.loc[(fresh != cached).any(axis=1), EPISODE_COLUMNS]
+
+
+def update_cache(df, months):
+    """
+    Rewrite the given month partitions of the parquet cache from df (all merged episodes),
+    so episodes whose title, date or description changed replace their cached rows.
+    """
+    rewrite = df[publish_months(df).isin(months)]
+    if not rewrite.empty:
+        save_cache(rewrite, existing_data_behavior='delete_matching')
+    # Months left with no episodes (e.g. an episode's date moved) are removed outright
+    for month in set(months) - set(publish_months(rewrite)):
+        shutil.rmtree(CACHE_DATASET / f"publish_month={month}", ignore_errors=True)
+
+
+def prepare_episodes(df, selected_urls=()):
+    """
+    Convert episodes to compact dtypes for display.
+    Podcast names become categorical (few podcasts, many episodes), dates become
+    datetimes, and a lowercase title+podcast column backs the search filter.
+    Adds the persistent 'selected' checkbox column, pre-checked for selected_urls.
+    """
+    df = df.reset_index(drop=True)
+    df.insert(0, 'selected', df['audio_url'].isin(selected_urls))
+    df['podcast_name'] = df['podcast_name'].astype('category')
+    # Dates are already normalised to YYYY-MM-DD by parse_feed; an explicit format skips per-value inference
+    df['publish_date'] = pd.to_datetime(df['publish_date'], format='%Y-%m-%d', errors='coerce')
+    df['_search'] = (df['episode_title'] + ' ' + df['podcast_name'].astype(str)).str.lower().fillna('')
+    return df
 
 
 def main():
@@ -125,16 +332,15 @@ def main():
             opml_source = default_opml
         else:
             uploaded_file = st.file_uploader("Upload OPML", type=['opml', 'xml'], key="opml_uploader")
-            if uploaded_file:
-                temp_path = Path("temp_opml.opml")
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                opml_source = temp_path
-            else:
-                opml_source = None
+            # Parsed straight from the in-memory upload
+            opml_source = uploaded_file
 
         # Max episodes setting
-        config = load_env_vars()
+        try:
+            config = load_env_vars()
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
         max_episodes = st.number_input(
             "Episodes per podcast",
             min_value=1,
@@ -147,18 +353,22 @@ def main():
         st.divider()
 
         # Cache info
-        if CACHE_FILE.exists():
-            cache_age = datetime.fromtimestamp(CACHE_FILE.stat().st_mtime)
+        files = cache_files()
+        if files:
+            cache_age = datetime.fromtimestamp(max(f.stat().st_mtime for f in files))
             st.info(f"📦 Cache from {cache_age.strftime('%H:%M')}\n{len(load_cache())} episodes")
             if st.button("🗑️ Clear Cache", key="clear_cache"):
-                CACHE_FILE.unlink()
+                shutil.rmtree(CACHE_DATASET)
+                # Validators are only meaningful alongside the cached episodes
+                CACHE_META.unlink(missing_ok=True)
+                fetch_episodes_cached.clear()
                 st.session_state.episodes_fetched = False
                 st.rerun()
         else:
             st.info("📦 No cache found")
 
     # Main area
-    if opml_source and opml_source.exists():
+    if opml_source is not None:
         # Parse OPML
         if not st.session_state.feeds:
             with st.spinner("Parsing OPML file..."):
@@ -184,55 +394,51 @@ def main():
         if should_fetch:
             st.write("Fetching episodes...")
 
-            # Progress bar and status
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-
-            all_episodes = []
-            seen_urls = set()  # Track unique episodes
-
-            # Add cached episodes first
-            if not cached_df.empty:
-                for _, row in cached_df.iterrows():
-                    url = row.get('audio_url', '')
-                    if url and url not in seen_urls:
-                        all_episodes.append(row.to_dict())
-                        seen_urls.add(url)
-
-            # Fetch new episodes
-            new_count = 0
-            for i, feed in enumerate(st.session_state.feeds):
-                # Update status (compact)
-                status_text.markdown(f"**{i+1}/{len(st.session_state.feeds)}:** {feed['title'][:50]}...")
-
-                episodes = fetch_episodes_cached(feed['url'], max_episodes)
-
-                for ep in episodes:
-                    # Skip if we already have this episode
-                    if ep['audio_url'] and ep['audio_url'] in seen_urls:
-                        continue
-
-                    all_episodes.append({
-                        'podcast_name': feed['title'],
-                        'episode_title': ep['title'],
-                        'publish_date': ep['pub_date'],
-                        'audio_url': ep['audio_url'],
-                        'description': ep['description']
-                    })
-                    seen_urls.add(ep['audio_url'])
-                    new_count += 1
-
-                progress_bar.progress((i + 1) / len(st.session_state.feeds))
-
-            status_text.empty()
-
-            # Create DataFrame
-            if all_episodes:
-                df = pd.DataFrame(all_episodes)
-                st.session_state.episodes_df = df
-
-                # Save to cache
-                save_cache(df)
+            # Fetch new episodes (all feeds concurrently)
+            feeds = st.session_state.feeds
+            with st.spinner(f"Fetching {len(feeds)} feeds..."):
+                feed_results, validators = fetch_episodes_cached(tuple(feed['url'] for feed in feeds), max_episodes)
+
+            new_df = pd.DataFrame([
+                {
+                    'podcast_name': feed['title'],
+                    'episode_title': ep['title'],
+                    'publish_date': ep['pub_date'],
+                    'audio_url': ep['audio_url'],
+                    'description': ep['description']
+                }
+                for feed, episodes in zip(feeds, feed_results)
+                for ep in episodes
+            ], columns=EPISODE_COLUMNS)
+            # Episodes without audio can't be transcribed (and can't be deduplicated)
+            new_df = new_df[new_df['audio_url'] != '']
+
+            # Episodes not in the cache yet, and cached episodes whose details changed
+            new_df = new_df.drop_duplicates('audio_url', keep='last')
+            new_episodes = new_df[~new_df['audio_url'].isin(cached_df.get('audio_url', []))]
+            new_count = len(new_episodes)
+            changed = changed_episodes(new_df, cached_df)
+
+            # Merge with cache; a freshly fetched copy of an episode replaces the cached one
+            df = pd.concat([cached_df, new_df], ignore_index=True)
+            df = df.drop_duplicates('audio_url', keep='last').reset_index(drop=True)
+
+            if not df.empty:
+                # Rewrite the months holding changed episodes, then append new episodes elsewhere
+                changed_months = set()
+                if not changed.empty:
+                    old_rows = cached_df[cached_df['audio_url'].isin(changed['audio_url'])]
+                    changed_months = set(publish_months(changed)) | set(publish_months(old_rows))
+                    update_cache(df, changed_months)
+                appended = new_episodes[~publish_months(new_episodes).isin(changed_months)]
+                if not appended.empty:
+                    save_cache(appended)
+                save_feed_validators(validators)
+
+                # Keep any episodes already selected before this fetch
+                previous_df = st.session_state.episodes_df
+                selected_urls = previous_df.loc[previous_df['selected'], 'audio_url'] if not previous_df.empty else []
+                st.session_state.episodes_df = prepare_episodes(df, selected_urls)
 
                 st.success(f"✅ Found {len(df)} total episodes ({new_count} new)")
             else:
@@ -241,7 +447,8 @@ def main():
 
         # Display episodes if we have them
         if not st.session_state.episodes_df.empty:
-            df = st.session_state.episodes_df
+            episodes_df = st.session_state.episodes_df
+            df = episodes_df
 
             # Filters
             col1, col2, col3 = st.columns([2, 1, 1])
@@ -253,9 +460,10 @@ def main():
                 order = st.selectbox("Order", ['Newest first', 'Oldest first'] if sort_by == 'publish_date' else ['A-Z', 'Z-A'], key="order")
 
             # Apply filters
-            if search:
-                df = df[df['episode_title'].str.contains(search, case=False, na=False) |
-                       df['podcast_name'].str.contains(search, case=False, na=False)]
+            # Every whitespace-separated term must appear (one pass over the search column)
+            terms = search.lower().split()
+            if terms:
+                df = df[[all(term in text for term in terms) for text in df['_search']]]
 
             # Sort
             if sort_by == 'publish_date':
@@ -265,30 +473,13 @@ def main():
 
             st.caption(f"Showing {len(df)} episodes")
 
-            # Initialize selections in session state if not exists (track as set of audio_urls)
-            if 'selections' not in st.session_state:
-                st.session_state.selections = set()
-
-            # Track the data key to detect when filter/sort changes
-            data_key = f"{len(df)}_{search}_{sort_by}_{order}"
-
-            # Check if this is a new data view (filter/sort changed)
-            is_new_data_view = ('last_data_key' not in st.session_state or
-                                st.session_state.last_data_key != data_key)
-
-            if is_new_data_view:
-                # Data changed: rebuild display with saved selections
-                st.session_state.last_data_key = data_key
-                df_display = df.copy()
-                df_display.insert(0, 'selected', df_display['audio_url'].isin(st.session_state.selections).astype(bool))
-            else:
-                # Same data: add empty selected column, let widget maintain state
-                df_display = df.copy()
-                df_display.insert(0, 'selected', False)
+            # Row edits are tracked by position, so give each filter/sort view its own
+            # editor state instead of letting a checkbox carry over to a different row
+            view_key = f"{search}_{sort_by}_{order}"
 
             # Display table with checkbox selection
             edited_df = st.data_editor(
-                df_display,
+                df,
                 column_config={
                     'selected': st.column_config.CheckboxColumn(
                         "Select",
@@ -296,15 +487,19 @@ def main():
                     ),
                     'podcast_name': st.column_config.TextColumn(
                         "Podcast",
-                        width="medium"
+                        width="medium",
+                        disabled=True
                     ),
                     'episode_title': st.column_config.TextColumn(
                         "Episode",
-                        width="large"
+                        width="large",
+                        disabled=True
                     ),
-                    'publish_date': st.column_config.TextColumn(
+                    'publish_date': st.column_config.DateColumn(
                         "Date",
-                        width="small"
+                        format="YYYY-MM-DD",
+                        width="small",
+                        disabled=True
                     ),
                     'description': st.column_config.TextColumn(
                         "Description",
@@ -315,26 +510,23 @@ def main():
                         "Audio URL",
                         width="medium",
                         disabled=True
-                    )
+                    ),
+                    '_search': None
                 },
                 hide_index=True,
                 use_container_width=True,
                 height=400,
-                key="episode_editor"
+                key=f"episode_editor_{view_key}"
             )
 
-            # Get selected rows from edited dataframe
-            selected_episodes = edited_df[edited_df['selected'] == True]
-
-            # Update session state for persistence across filter/sort operations
-            # Only update if the set of selections actually changed (prevents loops)
-            new_selections = set(selected_episodes['audio_url'])
-            if 'last_known_selections' not in st.session_state:
-                st.session_state.last_known_selections = set()
+            # Write checkbox changes back to the session DataFrame (matched by index),
+            # so selections persist across filter/sort operations. Only 'selected' is
+            # editable, so nothing else can be changed in the grid and lost on export.
+            changed = edited_df['selected'] != df['selected']
+            if changed.any():
+                episodes_df.loc[edited_df.index[changed], 'selected'] = edited_df.loc[changed, 'selected']
 
-            if new_selections != st.session_state.last_known_selections:
-                st.session_state.selections = new_selections
-                st.session_state.last_known_selections = new_selections
+            selected_episodes = episodes_df[episodes_df['selected']]
 
             # Show selected episodes section
             st.divider()
@@ -342,9 +534,11 @@ def main():
             if not selected_episodes.empty:
                 st.subheader(f"Selected Episodes: {len(selected_episodes)}")
 
-                # Simple text display (no flickering dataframe)
-                for _, row in selected_episodes.iterrows():
-                    st.text(f"{row['podcast_name']} - {row['episode_title']} ({row['publish_date']})")
+                # Simple text display (no flickering dataframe), sent as one element
+                lines = (selected_episodes['podcast_name'].astype(str) + ' - '
+                         + selected_episodes['episode_title'] + ' ('
+                         + selected_episodes['publish_date'].dt.strftime('%Y-%m-%d').fillna('') + ')')
+                st.text('\n'.join(lines))
             else:
                 st.subheader("Selected Episodes: 0")
                 st.info("Check the boxes in the table above to select episodes")
@@ -356,8 +550,7 @@ def main():
             with col1:
                 if st.button("💾 Export to CSV", type="primary", use_container_width=True, key="export_button"):
                     if not selected_episodes.empty:
-                        export_df = selected_episodes[['podcast_name', 'episode_title',
-                                                      'publish_date', 'audio_url', 'description']]
+                        export_df = selected_episodes[EPISODE_COLUMNS]
 
                         csv_path = Path("selected_episodes.csv")
                         export_df.to_csv(csv_path, index=False, encoding='utf-8')
@@ -4,77 +4,332 @@ Reads CSV from Script 1, downloads audio files, and transcribes using Deep Infra
 Run with: python 2_transcribe.py
 """
 
+import httpx
 import pandas as pd
-import requests
 from pathlib import Path
-from tqdm import tqdm
-from tenacity import retry, stop_after_attempt, wait_exponential
-from openai import OpenAI
+from tqdm.asyncio import tqdm
+from tenacity import retry, stop_after_attempt
+from openai import AsyncOpenAI
 from utils import (
-    load_env_vars, sanitize_filename, create_transcript_path,
-    log_error, write_text_file
+    load_env_vars, create_transcript_path, get_audio_filename, sanitize_filename,
+    log_error, read_text_file, write_text_file, write_json_file, cache_lookup, cache_store,
+    wait_retry_after
 )
 from datetime import datetime
-import json
+from urllib.parse import urlparse
+import asyncio
+import hashlib
+import io
 import os
+import tempfile
+
+DEEPINFRA_BASE_URL = "https://api.deepinfra.com/v1/openai"
+
+# Transcription API timeout (the SDK's default; long episodes take minutes)
+TRANSCRIPTION_TIMEOUT = httpx.Timeout(600, connect=5)
+
+# Audio download configuration
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Audio up to 8 MiB is kept in memory, larger downloads go to a temp file.
+# Peak in-memory audio is about TRANSCRIBE_CONCURRENCY x this limit.
+AUDIO_MEMORY_LIMIT = 8 << 20
+
+# Upload content types by extension; other URL names fall back to "<episode>.mp3"
+AUDIO_MIME_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.m4a': 'audio/mp4',
+    '.mp4': 'audio/mp4',
+    '.aac': 'audio/aac',
+    '.ogg': 'audio/ogg',
+    '.opus': 'audio/ogg',
+    '.wav': 'audio/wav',
+    '.flac': 'audio/flac',
+    '.webm': 'audio/webm',
+}
+
+# Concurrency configuration: downloads per audio host. Episodes in flight, and so
+# Deep Infra API calls, are capped by TRANSCRIBE_CONCURRENCY.
+MAX_REQUESTS_PER_HOST = 4
+
+_host_semaphores = {}
+_inflight_transcriptions = {}
+
+
+def create_http_client():
+    """Create the shared HTTP/2 client so downloads and API calls reuse TCP+TLS connections per host."""
+    return httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        timeout=60,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    )
 
 
-def download_audio_file(audio_url, download_path):
+def create_deepinfra_client(api_key, http_client):
     """
-    Download audio file from URL to local path.
-    Returns the path to downloaded file.
+    Create the Deep Infra (OpenAI-compatible) client once per run on top of the
+    shared HTTP client, so every transcription reuses the same keep-alive pool.
+    Transcribing a long episode takes minutes, so API calls get their own timeout
+    instead of the download client's 60 s. Retries are left to tenacity.
     """
-    try:
-        response = requests.get(audio_url, stream=True, timeout=60)
-        response.raise_for_status()
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=DEEPINFRA_BASE_URL,
+        http_client=http_client,
+        timeout=TRANSCRIPTION_TIMEOUT,
+        max_retries=0
+    )
+
+
+def host_semaphore(url):
+    """Return the semaphore capping concurrent requests to the URL's host."""
+    host = urlparse(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+    return _host_semaphores[host]
+
+
+def find_transcript_by_hash(audio_hash, model):
+    """Return an existing transcript of identical audio made with the same model, if any."""
+    # Content hashes share the URL cache table, under their own key prefix
+    return cache_lookup(f"blake2b:{audio_hash}", model)
+
 
-        # Ensure parent directory exists
-        download_path.parent.mkdir(parents=True, exist_ok=True)
+def register_transcript_hash(audio_hash, model, transcript_path):
+    """Record which transcript was produced from this audio content."""
+    cache_store(f"blake2b:{audio_hash}", model, transcript_path)
 
-        with open(download_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
 
-        return download_path
+def move_to_temp_file(buffer):
+    """Move an in-memory audio buffer into a temp file that is deleted on close."""
+    temp_file = tempfile.TemporaryFile()
+    with buffer.getbuffer() as view:
+        temp_file.write(view)
+    buffer.close()
+    return temp_file
 
-    except requests.exceptions.RequestException as e:
+
+async def download_audio_file(http_client, audio_url):
+    """
+    Download audio file from URL, hashing the content as it streams in.
+    Audio up to AUDIO_MEMORY_LIMIT stays in an in-memory BytesIO; larger
+    downloads move to a temp file that is removed automatically when closed.
+    (A SpooledTemporaryFile would not do: httpx sizes upload files via fileno(),
+    which forces the spool onto disk.)
+    Returns (file rewound to the start, hex digest of the audio).
+    """
+    audio_file = io.BytesIO()
+    try:
+        hasher = hashlib.blake2b()
+        async with http_client.stream("GET", audio_url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if isinstance(audio_file, io.BytesIO) and audio_file.tell() + len(chunk) > AUDIO_MEMORY_LIMIT:
+                    audio_file = move_to_temp_file(audio_file)
+                audio_file.write(chunk)
+                hasher.update(chunk)
+
+        audio_file.seek(0)
+        return audio_file, hasher.hexdigest()
+
+    except httpx.HTTPError as e:
+        audio_file.close()
         raise Exception(f"Failed to download audio: {str(e)}")
 
 
+def get_upload_filename(audio_url, podcast_name, episode_title):
+    """Name for the uploaded audio: the URL's file name if it has a known audio extension."""
+    filename = get_audio_filename(audio_url)
+    if Path(filename).suffix.lower() in AUDIO_MIME_TYPES:
+        return filename
+    return sanitize_filename(f"{podcast_name}_{episode_title}.mp3")
+
+
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=60)
+    wait=wait_retry_after
 )
-def transcribe_audio_deepinfra(audio_file_path, api_key, model="openai/whisper-large-v3"):
+async def transcribe_audio_deepinfra(client, audio_file, filename, model="openai/whisper-large-v3"):
     """
-    Transcribe audio file using Deep Infra Whisper API via OpenAI SDK.
-    Requires the audio file to be downloaded first.
+    Transcribe audio using Deep Infra Whisper API via the async OpenAI SDK.
+    Takes the shared Deep Infra client and the downloaded audio as an open file object.
     """
-    # Initialize OpenAI client with Deep Infra base URL
-    client = OpenAI(
-        api_key=api_key,
-        base_url="https://api.deepinfra.com/v1/openai"
-    )
-
     try:
-        # Open the audio file and transcribe
-        with open(audio_file_path, 'rb') as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model=model,
-                file=audio_file
-            )
+        # Rewind in case a previous attempt consumed the file
+        audio_file.seek(0)
+        transcript = await client.audio.transcriptions.create(
+            model=model,
+            file=(filename, audio_file, AUDIO_MIME_TYPES.get(Path(filename).suffix.lower(), 'audio/mpeg'))
+        )
 
         return transcript.text
 
     except Exception as e:
-        raise Exception(f"Transcription API error: {str(e)}")
+        raise Exception(f"Transcription API error: {str(e)}") from e
 
 
 def create_metadata_file(transcript_path, metadata):
     """Create a metadata file alongside the transcript."""
     metadata_path = transcript_path.parent / f"{transcript_path.stem}_metadata.json"
-    write_text_file(metadata_path, json.dumps(metadata, indent=2))
+    write_json_file(metadata_path, metadata)
+
+
+async def get_transcription(http_client, deepinfra_client, audio_url, audio_filename, model):
+    """
+    Get the transcription for an audio URL, reusing earlier work where possible.
+    Returns (transcription, audio hash or None, reuse message or None).
+    """
+    audio_hash = None
+    cached_transcript = cache_lookup(audio_url, model)
+    if cached_transcript:
+        # Same URL was transcribed before (possibly under another title); skip the download
+        transcription = read_text_file(cached_transcript)
+        reused_message = f"Reused transcript of same audio URL ({cached_transcript})"
+    else:
+        # Download audio file
+        async with host_semaphore(audio_url):
+            audio_file, audio_hash = await download_audio_file(http_client, audio_url)
+
+        with audio_file:
+            existing_transcript = find_transcript_by_hash(audio_hash, model)
+            if existing_transcript:
+                # Same audio was transcribed before; reuse it instead of calling the API
+                transcription = read_text_file(existing_transcript)
+                reused_message = f"Reused transcript of identical audio ({existing_transcript})"
+            else:
+                # Transcribe using Deep Infra API (one call per episode in flight)
+                transcription = await transcribe_audio_deepinfra(
+                    deepinfra_client,
+                    audio_file,
+                    audio_filename,
+                    model
+                )
+                reused_message = None
+
+    return transcription, audio_hash, reused_message
+
+
+async def get_transcription_once(http_client, deepinfra_client, audio_url, audio_filename, model):
+    """
+    Single-flight wrapper around get_transcription: rows sharing an audio URL
+    (re-releases, cross-posts) wait on the one in-flight request instead of
+    downloading and transcribing the same audio again.
+    """
+    task = _inflight_transcriptions.get(audio_url)
+    if task is None:
+        task = asyncio.create_task(
+            get_transcription(http_client, deepinfra_client, audio_url, audio_filename, model)
+        )
+        _inflight_transcriptions[audio_url] = task
+        task.add_done_callback(lambda _: _inflight_transcriptions.pop(audio_url, None))
+    # Shield so one cancelled row doesn't cancel the request for the others
+    return await asyncio.shield(task)
+
+
+async def process_episode(http_client, deepinfra_client, row, config):
+    """
+    Download and transcribe a single episode.
+    Returns (success, message) for progress reporting.
+    """
+    podcast_name = row.podcast_name
+    episode_title = row.episode_title
+    audio_url = row.audio_url
+
+    # Skip if no audio URL
+    if not audio_url or pd.isna(audio_url):
+        log_error("2_transcribe", f"No audio URL for {episode_title}")
+        return False, f"Skipping {episode_title}: No audio URL found"
+
+    try:
+        # Create paths (inside the try, so a bad row is one error, not an aborted run)
+        transcript_path = create_transcript_path(podcast_name, episode_title)
+        audio_filename = get_upload_filename(audio_url, podcast_name, episode_title)
+
+        # Skip if already transcribed
+        if transcript_path.exists():
+            return True, f"Already exists, skipping: {episode_title}"
+
+        transcription, audio_hash, reused_message = await get_transcription_once(
+            http_client, deepinfra_client, audio_url, audio_filename, config['transcription_model']
+        )
+
+        if not transcription:
+            log_error("2_transcribe", f"Empty transcription for {episode_title}")
+            return False, f"Warning: Empty transcription received for {episode_title}"
+
+        # Save transcript
+        write_text_file(transcript_path, transcription)
+        cache_store(audio_url, config['transcription_model'], transcript_path)
+        if audio_hash:
+            register_transcript_hash(audio_hash, config['transcription_model'], transcript_path)
+
+        # Create metadata file
+        metadata = {
+            "podcast_name": podcast_name,
+            "episode_title": episode_title,
+            "audio_url": audio_url,
+            "transcription_date": datetime.now().isoformat(),
+            "model_used": config['transcription_model']
+        }
+        create_metadata_file(transcript_path, metadata)
+
+        if reused_message:
+            return True, f"{reused_message} for: {transcript_path}"
+        return True, f"Saved transcript to: {transcript_path}"
+
+    except Exception as e:
+        log_error("2_transcribe", f"Failed to transcribe {episode_title}: {str(e)}")
+        return False, f"Error ({episode_title}): {str(e)}"
+
+
+def find_transcribed():
+    """
+    Collect (podcast folder, transcript filename) pairs already on disk
+    with a single walk of the transcripts folder.
+    """
+    transcribed = set()
+    for dirpath, _, filenames in os.walk("transcripts"):
+        podcast_folder = os.path.basename(dirpath)
+        transcribed.update((podcast_folder, filename) for filename in filenames)
+    return transcribed
+
+
+def filter_untranscribed(df):
+    """Drop rows whose transcript already exists, so workers only see real work."""
+    transcribed = find_transcribed()
+    todo = [
+        (sanitize_filename(str(podcast_name)), f"{sanitize_filename(str(episode_title))}.txt") not in transcribed
+        for podcast_name, episode_title in zip(df['podcast_name'], df['episode_title'])
+    ]
+    return df[todo]
+
+
+async def transcribe_all(df, config):
+    """
+    Download and transcribe all episodes concurrently (capped at TRANSCRIBE_CONCURRENCY).
+    Returns (success_count, error_count).
+    """
+    semaphore = asyncio.Semaphore(config['transcribe_concurrency'])
+    success_count = 0
+    error_count = 0
+
+    async with create_http_client() as http_client:
+        deepinfra_client = create_deepinfra_client(config['deep_infra_key'], http_client)
+
+        async def process_with_limit(row):
+            async with semaphore:
+                return await process_episode(http_client, deepinfra_client, row, config)
+
+        tasks = [process_with_limit(row) for row in df.itertuples(index=False)]
+        for task in tqdm.as_completed(tasks, total=len(tasks), desc="Transcribing"):
+            ok, message = await task
+            tqdm.write(f"  {message}")
+            if ok:
+                success_count += 1
+            else:
+                error_count += 1
+
+    return success_count, error_count
 
 
 def main():
@@ -82,7 +337,11 @@ def main():
     print("=" * 50)
 
     # Load configuration
-    config = load_env_vars()
+    try:
+        config = load_env_vars()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
 
     if not config['deep_infra_key']:
         print("Error: DEEP_INFRA_API_KEY not found in .env file")
@@ -96,84 +355,19 @@ def main():
         print("Please run Script 1 (1_episode_selector.py) first to generate the CSV file")
         return
 
-    # Create temporary download directory
-    temp_dir = Path("temp_audio")
-    temp_dir.mkdir(exist_ok=True)
-
     # Load episodes from CSV
     df = pd.read_csv(csv_path)
     print(f"\nFound {len(df)} episodes in CSV")
 
-    # Process each episode
-    success_count = 0
-    error_count = 0
-
-    for idx, row in tqdm(df.iterrows(), total=len(df), desc="Transcribing"):
-        podcast_name = row['podcast_name']
-        episode_title = row['episode_title']
-        audio_url = row['audio_url']
-
-        print(f"\n[{idx + 1}/{len(df)}] Processing: {episode_title}")
-
-        # Skip if no audio URL
-        if not audio_url or pd.isna(audio_url):
-            print(f"  Skipping: No audio URL found")
-            log_error("2_transcribe", f"No audio URL for {episode_title}")
-            error_count += 1
-            continue
-
-        # Create paths
-        transcript_path = create_transcript_path(podcast_name, episode_title)
-        audio_filename = sanitize_filename(f"{podcast_name}_{episode_title}.mp3")
-        audio_download_path = temp_dir / audio_filename
+    # Skip episodes that already have a transcript before starting any work
+    todo_df = filter_untranscribed(df)
+    skipped_count = len(df) - len(todo_df)
+    if skipped_count:
+        print(f"Already transcribed, skipping: {skipped_count}")
 
-        # Skip if already transcribed
-        if transcript_path.exists():
-            print(f"  Already exists, skipping")
-            success_count += 1
-            continue
-
-        try:
-            # Download audio file
-            print(f"  Downloading audio...")
-            download_audio_file(audio_url, audio_download_path)
-            print(f"  Downloaded to: {audio_download_path}")
-
-            # Transcribe using Deep Infra API
-            print(f"  Transcribing via Deep Infra Whisper API...")
-            transcription = transcribe_audio_deepinfra(
-                audio_download_path,
-                config['deep_infra_key'],
-                config['transcription_model']
-            )
-
-            if not transcription:
-                print(f"  Warning: Empty transcription received")
-                log_error("2_transcribe", f"Empty transcription for {episode_title}")
-                error_count += 1
-                continue
-
-            # Save transcript
-            write_text_file(transcript_path, transcription)
-
-            # Create metadata file
-            metadata = {
-                "podcast_name": podcast_name,
-                "episode_title": episode_title,
-                "audio_url": audio_url,
-                "transcription_date": datetime.now().isoformat(),
-                "model_used": config['transcription_model']
-            }
-            create_metadata_file(transcript_path, metadata)
-
-            print(f"  Saved transcript to: {transcript_path}")
-            success_count += 1
-
-        except Exception as e:
-            print(f"  Error: {str(e)}")
-            log_error("2_transcribe", f"Failed to transcribe {episode_title}: {str(e)}")
-            error_count += 1
-            continue
+    # Process episodes concurrently (downloads and API calls are I/O-bound)
+    success_count, error_count = asyncio.run(transcribe_all(todo_df, config))
+    success_count += skipped_count
 
     # Summary
     print("\n" + "=" * 50)
@@ -182,7 +376,6 @@ def main():
     print(f"  Errors: {error_count}")
     print(f"  Total: {len(df)}")
     print(f"\nTranscripts saved to: {Path('transcripts').absolute()}")
-    print(f"Audio files saved to: {temp_dir.absolute()}")
 
 
 if __name__ == "__main__":
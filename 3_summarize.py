@@ -5,72 +5,189 @@ Run with: python 3_summarize.py --category global_macro
 """
 
 import argparse
+import asyncio
+import json
+import os
+import shutil
+import tiktoken
 import yaml
+from functools import lru_cache
 from pathlib import Path
-from tqdm import tqdm
-from tenacity import retry, stop_after_attempt, wait_exponential
-from openai import OpenAI
-from anthropic import Anthropic
+from tqdm.asyncio import tqdm
+from tenacity import retry, stop_after_attempt
+from openai import AsyncOpenAI
+from anthropic import AsyncAnthropic
 from utils import (
-    load_env_vars, read_text_file, create_summary_path,
-    log_error, write_text_file, sanitize_filename
+    load_env_vars, read_text_file_bounded, create_summary_path,
+    log_error, write_text_file, sanitize_filename, wait_retry_after,
+    cache_lookup, cache_store
 )
 from datetime import datetime
 
+SYSTEM_MESSAGE = "You are a helpful assistant that summarizes podcast transcripts."
+
+# OpenAI Batch API (--batch)
+BATCH_POLL_INTERVAL = 60  # seconds between status checks
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+BATCH_LOOKUP_LIMIT = 100  # recent batches checked before re-submitting
+
+# libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Token budget: transcripts are truncated so prompt + transcript + reply fit the context
+SUMMARY_MAX_TOKENS = 4000
+TOKEN_SAFETY_MARGIN = 256
+# Used for models tiktoken doesn't know (Anthropic, open models via OpenRouter/Deep Infra)
+FALLBACK_ENCODING = "o200k_base"
+# Upper bound on characters per token, so only the part of a transcript that can fit is read
+MAX_CHARS_PER_TOKEN = 8
+# Average characters per token, used when no tiktoken encoding is available
+APPROX_CHARS_PER_TOKEN = 4
+
+# Concurrent LLM requests (keep within the provider's rate limits)
+MAX_CONCURRENT_SUMMARIES = 4
+
 
 def load_prompt_templates():
-    """Load prompt templates from YAML file."""
+    """Load prompt templates from YAML file (re-parsed only when the file changes)."""
     template_path = Path("prompt_templates.yaml")
-    if not template_path.exists():
-        raise FileNotFoundError(f"prompt_templates.yaml not found at {template_path}")
+    try:
+        mtime_ns = template_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"prompt_templates.yaml not found at {template_path}") from None
+
+    return parse_prompt_templates(template_path, mtime_ns)
+
 
-    with open(template_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+@lru_cache(maxsize=1)
+def parse_prompt_templates(template_path, mtime_ns):
+    """Parse the templates file; mtime_ns is part of the cache key so edits are picked up."""
+    return yaml.load(template_path.read_bytes(), Loader=YAML_LOADER)
 
 
 def get_transcripts():
     """Get all transcript files from transcripts folder."""
-    transcripts_path = Path("transcripts")
-    if not transcripts_path.exists():
+    try:
+        podcast_entries = list(os.scandir("transcripts"))
+    except FileNotFoundError:
         return []
 
+    # DirEntry caches the file type from the directory listing, so no extra stat per file
     transcripts = []
-    for podcast_folder in transcripts_path.iterdir():
-        if podcast_folder.is_dir():
-            for transcript_file in podcast_folder.iterdir():
-                if transcript_file.is_file() and transcript_file.suffix == '.txt':
-                    # Skip metadata files
-                    if not transcript_file.stem.endswith('_metadata'):
-                        transcripts.append({
-                            'podcast_name': podcast_folder.name,
-                            'episode_title': transcript_file.stem,
-                            'path': transcript_file
-                        })
+    for podcast_entry in podcast_entries:
+        if not podcast_entry.is_dir():
+            continue
+        with os.scandir(podcast_entry.path) as entries:
+            for entry in entries:
+                name = entry.name
+                # Skip metadata files
+                if name.endswith('.txt') and not name.endswith('_metadata.txt') and entry.is_file():
+                    transcripts.append({
+                        'podcast_name': podcast_entry.name,
+                        'episode_title': name[:-len('.txt')],
+                        'path': Path(entry.path)
+                    })
 
     return transcripts
 
 
+def find_summarized(category):
+    """
+    Collect (podcast folder, summary filename) pairs already saved for a category
+    with a single walk of its summaries folder.
+    """
+    category_folder = Path("summaries") / sanitize_filename(category)
+    summarized = set()
+    for dirpath, _, filenames in os.walk(category_folder):
+        podcast_folder = os.path.basename(dirpath)
+        summarized.update((podcast_folder, filename) for filename in filenames)
+    return summarized
+
+
+def get_encoding(model):
+    """
+    Return the tiktoken encoding for a model, or an approximation for non-OpenAI models.
+    Returns None if the encoding can't be loaded (tiktoken downloads it on first use),
+    in which case token counts are estimated from character counts.
+    """
+    try:
+        try:
+            # OpenRouter-style names carry a vendor prefix, e.g. openai/gpt-4o
+            return tiktoken.encoding_for_model(model.split('/')[-1])
+        except KeyError:
+            return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception as e:
+        print(f"Warning: Could not load tiktoken encoding ({e}); "
+              f"estimating {APPROX_CHARS_PER_TOKEN} chars per token instead")
+        return None
+
+
+def count_tokens(text, encoding):
+    """Count tokens with the encoding, or estimate from length when there is none."""
+    if encoding is None:
+        return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def load_transcript(transcript_path, encoding, max_tokens):
+    """
+    Read a transcript truncated to at most max_tokens tokens.
+    Without an encoding, falls back to a character cap of the estimated size.
+    Returns (transcript, truncated).
+    """
+    if encoding is None:
+        return read_text_file_bounded(transcript_path, max_tokens * APPROX_CHARS_PER_TOKEN)
+
+    transcript, truncated = read_text_file_bounded(transcript_path, max_tokens * MAX_CHARS_PER_TOKEN)
+    tokens = encoding.encode(transcript, disallowed_special=())
+    if len(tokens) > max_tokens:
+        return encoding.decode(tokens[:max_tokens]), True
+    return transcript, truncated
+
+
+def create_llm_client(provider, config):
+    """
+    Create the API client for a provider once per run, so every summary
+    reuses the same connection pool. SDK retries are off; tenacity handles them.
+    """
+    if provider == "openai":
+        return AsyncOpenAI(api_key=config['llm_key'], max_retries=0)
+    elif provider == "anthropic":
+        return AsyncAnthropic(api_key=config['llm_key'], max_retries=0)
+    elif provider == "deepinfra":
+        return AsyncOpenAI(
+            base_url="https://api.deepinfra.com/v1/openai",
+            api_key=config['llm_key'],
+            max_retries=0
+        )
+    elif provider == "openrouter":
+        return AsyncOpenAI(
+            base_url="https://openrouter.ai/api/v1",
+            api_key=config['openrouter_key'],
+            max_retries=0
+        )
+    raise ValueError(f"Unknown provider: {provider}")
+
+
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=60)
+    wait=wait_retry_after
 )
-def summarize_with_openai(transcript, prompt, api_key, model="gpt-4o"):
+async def summarize_with_openai(client, user_message, model="gpt-4o"):
     """Generate summary using OpenAI API."""
-    client = OpenAI(api_key=api_key)
-
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model=model,
         messages=[
             {
                 "role": "system",
-                "content": "You are a helpful assistant that summarizes podcast transcripts."
+                "content": SYSTEM_MESSAGE
             },
             {
                 "role": "user",
-                "content": f"{prompt}\n\nTranscript:\n{transcript}"
+                "content": user_message
             }
         ],
-        max_tokens=4000,
+        max_tokens=SUMMARY_MAX_TOKENS,
         temperature=0.3
     )
 
@@ -79,20 +196,18 @@ def summarize_with_openai(transcript, prompt, api_key, model="gpt-4o"):
 
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=60)
+    wait=wait_retry_after
 )
-def summarize_with_anthropic(transcript, prompt, api_key, model="claude-3-5-sonnet-20241022"):
+async def summarize_with_anthropic(client, user_message, model="claude-3-5-sonnet-20241022"):
     """Generate summary using Anthropic API."""
-    client = Anthropic(api_key=api_key)
-
-    response = client.messages.create(
+    response = await client.messages.create(
         model=model,
-        max_tokens=4000,
+        max_tokens=SUMMARY_MAX_TOKENS,
         temperature=0.3,
         messages=[
             {
                 "role": "user",
-                "content": f"{prompt}\n\nTranscript:\n{transcript}"
+                "content": user_message
             }
         ]
     )
@@ -100,26 +215,25 @@ def summarize_with_anthropic(transcript, prompt, api_key, model="claude-3-5-sonn
     return response.content[0].text
 
 
-def summarize_with_deepinfra(transcript, prompt, api_key, model="mixtral-8x7b"):
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_retry_after
+)
+async def summarize_with_deepinfra(client, user_message, model="mixtral-8x7b"):
     """Generate summary using Deep Infra API (OpenAI-compatible)."""
-    client = OpenAI(
-        base_url="https://api.deepinfra.com/v1/openai",
-        api_key=api_key
-    )
-
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model=model,
         messages=[
             {
                 "role": "system",
-                "content": "You are a helpful assistant that summarizes podcast transcripts."
+                "content": SYSTEM_MESSAGE
             },
             {
                 "role": "user",
-                "content": f"{prompt}\n\nTranscript:\n{transcript}"
+                "content": user_message
             }
         ],
-        max_tokens=4000,
+        max_tokens=SUMMARY_MAX_TOKENS,
         temperature=0.3
     )
 
@@ -128,34 +242,371 @@ def summarize_with_deepinfra(transcript, prompt, api_key, model="mixtral-8x7b"):
 
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=60)
+    wait=wait_retry_after
 )
-def summarize_with_openrouter(transcript, prompt, api_key, base_url, model):
+async def summarize_with_openrouter(client, user_message, model):
     """Generate summary using OpenRouter API (OpenAI-compatible)."""
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=api_key
-    )
-
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model=model,
         messages=[
             {
                 "role": "system",
-                "content": "You are a helpful assistant that summarizes podcast transcripts."
+                "content": SYSTEM_MESSAGE
             },
             {
                 "role": "user",
-                "content": f"{prompt}\n\nTranscript:\n{transcript}"
+                "content": user_message
             }
         ],
-        max_tokens=4000,
+        max_tokens=SUMMARY_MAX_TOKENS,
         temperature=0.3
     )
 
     return response.choices[0].message.content
 
 
+def summary_key(podcast_name, episode_title):
+    """Key of a transcript's summary in the set returned by find_summarized."""
+    return sanitize_filename(podcast_name), f"{sanitize_filename(episode_title)}_summary.txt"
+
+
+def transcript_audio_url(transcript_path):
+    """Audio URL recorded in the transcript's _metadata.json by 2_transcribe.py, if any."""
+    metadata_path = transcript_path.parent / f"{transcript_path.stem}_metadata.json"
+    try:
+        return json.loads(metadata_path.read_text(encoding='utf-8')).get('audio_url')
+    except (OSError, ValueError):
+        return None
+
+
+def summary_cache_model(category, provider, model):
+    """Model key for summaries in the URL cache (the category's prompt matters too)."""
+    return f"summary:{category}:{provider}/{model}"
+
+
+def reuse_cached_summary(audio_url, summary_path, category, provider, model):
+    """
+    Copy an earlier summary of the same audio URL (e.g. one saved under the
+    episode's old title) to summary_path.
+    Returns the cached summary path, or None if there is nothing to reuse.
+    """
+    if not audio_url:
+        return None
+    cached_summary = cache_lookup(audio_url, summary_cache_model(category, provider, model))
+    if cached_summary is None:
+        return None
+
+    shutil.copyfile(cached_summary, summary_path)
+    return cached_summary
+
+
+def transcript_token_budget(prompt, model, config):
+    """
+    Return (encoding, max transcript tokens) for a run:
+    context - reply - prompt - margin, with the prompt tokens counted once.
+    Raises ValueError if the configured context is too small to fit any transcript.
+    """
+    encoding = get_encoding(model)
+    prompt_tokens = count_tokens(f"{prompt}\n\nTranscript:\n", encoding)
+    max_transcript_tokens = (
+        config['summary_context_tokens'] - SUMMARY_MAX_TOKENS - prompt_tokens - TOKEN_SAFETY_MARGIN
+    )
+    if max_transcript_tokens <= 0:
+        raise ValueError(
+            f"SUMMARY_CONTEXT_TOKENS={config['summary_context_tokens']} leaves no room for the transcript "
+            f"(reply {SUMMARY_MAX_TOKENS} + prompt {prompt_tokens} + margin {TOKEN_SAFETY_MARGIN} tokens)"
+        )
+    return encoding, max_transcript_tokens
+
+
+def format_summary(category, podcast_name, episode_title, provider, model, summary):
+    """Prefix a summary with its metadata header."""
+    metadata_header = f"""# Summary Metadata
+Category: {category}
+Podcast: {podcast_name}
+Episode: {episode_title}
+Generated: {datetime.now().isoformat()}
+Model: {provider}/{model}
+
+---
+
+"""
+    return metadata_header + summary
+
+
+async def summarize_transcript(client, semaphore, transcript_info, prompt, category, provider, model, summarized,
+                               encoding, max_transcript_tokens):
+    """
+    Summarize a single transcript and save it to the summaries folder.
+    Only the LLM call holds the semaphore; file reads and writes run in worker
+    threads so they overlap with other transcripts' requests.
+    Returns (success, message) for progress reporting.
+    """
+    podcast_name = transcript_info['podcast_name']
+    episode_title = transcript_info['episode_title']
+    transcript_path = transcript_info['path']
+
+    try:
+        # Skip if already summarized (checked before the summary folder is created)
+        if summary_key(podcast_name, episode_title) in summarized:
+            return True, f"Already exists, skipping: {episode_title}"
+
+        # Create summary path
+        summary_path = create_summary_path(category, podcast_name, episode_title)
+
+        # The set lookup is case-sensitive; exists() also catches a title that differs
+        # only in case on case-insensitive filesystems (NTFS, APFS)
+        if await asyncio.to_thread(summary_path.exists):
+            return True, f"Already exists, skipping: {episode_title}"
+
+        # Reuse a summary of the same audio URL saved under a different title
+        audio_url = await asyncio.to_thread(transcript_audio_url, transcript_path)
+        cached_summary = await asyncio.to_thread(
+            reuse_cached_summary, audio_url, summary_path, category, provider, model
+        )
+        if cached_summary:
+            return True, f"Reused summary of same audio URL ({cached_summary}) for: {summary_path}"
+
+        # Read transcript (only as much as will be sent)
+        transcript, truncated = await asyncio.to_thread(
+            load_transcript, transcript_path, encoding, max_transcript_tokens
+        )
+        if truncated:
+            tqdm.write(f"  Warning: Transcript longer than {max_transcript_tokens} tokens, truncating: {episode_title}")
+
+        # Build the user message once so retries reuse the same string
+        user_message = f"{prompt}\n\nTranscript:\n{transcript}"
+
+        # Generate summary based on provider
+        async with semaphore:
+            if provider == "openai":
+                summary = await summarize_with_openai(client, user_message, model)
+            elif provider == "anthropic":
+                summary = await summarize_with_anthropic(client, user_message, model)
+            elif provider == "deepinfra":
+                summary = await summarize_with_deepinfra(client, user_message, model)
+            elif provider == "openrouter":
+                summary = await summarize_with_openrouter(client, user_message, model)
+            else:
+                log_error("3_summarize", f"Unknown provider: {provider}")
+                return False, f"Error: Unknown provider '{provider}'"
+
+        # Add metadata to summary
+        full_summary = format_summary(category, podcast_name, episode_title, provider, model, summary)
+
+        # Save summary
+        await asyncio.to_thread(write_text_file, summary_path, full_summary)
+        if audio_url:
+            cache_store(audio_url, summary_cache_model(category, provider, model), summary_path)
+
+        return True, f"Saved to: {summary_path}"
+
+    except Exception as e:
+        log_error("3_summarize", f"Failed to summarize {episode_title}: {str(e)}")
+        return False, f"Error ({podcast_name} - {episode_title}): {str(e)}"
+
+
+async def summarize_all(transcripts, prompt, category, provider, model, config,
+                        encoding, max_transcript_tokens):
+    """
+    Summarize all transcripts concurrently (capped at MAX_CONCURRENT_SUMMARIES).
+    Returns (success_count, error_count).
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SUMMARIES)
+    # Allow a few transcripts beyond the LLM limit to be read/written meanwhile,
+    # without loading every transcript into memory at once
+    pipeline_semaphore = asyncio.Semaphore(2 * MAX_CONCURRENT_SUMMARIES)
+    summarized = find_summarized(category)
+    success_count = 0
+    error_count = 0
+
+    async with create_llm_client(provider, config) as client:
+        async def summarize_in_pipeline(transcript_info):
+            async with pipeline_semaphore:
+                return await summarize_transcript(client, semaphore, transcript_info, prompt, category, provider,
+                                                  model, summarized, encoding, max_transcript_tokens)
+
+        tasks = [summarize_in_pipeline(transcript_info) for transcript_info in transcripts]
+        for task in tqdm.as_completed(tasks, total=len(tasks), desc="Summarizing"):
+            ok, message = await task
+            tqdm.write(f"  {message}")
+            if ok:
+                success_count += 1
+            else:
+                error_count += 1
+
+    return success_count, error_count
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_retry_after
+)
+async def retrieve_batch(client, batch_id):
+    """Fetch a batch's current status (retried, so one network error doesn't orphan the batch)."""
+    return await client.batches.retrieve(batch_id)
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_retry_after
+)
+async def download_file_text(client, file_id):
+    """Download an OpenAI file (e.g. batch output) as text."""
+    content = await client.files.content(file_id)
+    return content.text
+
+
+async def find_batch_for_input(client, input_file_id):
+    """Return a recent batch created from input_file_id, or None."""
+    recent = await client.batches.list(limit=BATCH_LOOKUP_LIMIT)
+    for batch in recent.data:
+        if batch.input_file_id == input_file_id:
+            return batch
+    return None
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_retry_after
+)
+async def submit_batch(client, input_file_id):
+    """
+    Create the batch for an uploaded input file. The API sends no idempotency key,
+    and a create that timed out or failed may still have started a (billed) batch,
+    so each attempt first looks for an existing batch from the same input file.
+    """
+    existing = await find_batch_for_input(client, input_file_id)
+    if existing:
+        return existing
+    return await client.batches.create(
+        input_file_id=input_file_id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+
+async def summarize_batch(transcripts, prompt, category, provider, model, config,
+                          encoding, max_transcript_tokens):
+    """
+    Summarize all transcripts through the OpenAI Batch API (about half the price,
+    results within 24 hours). Submits one JSONL file of chat completion requests,
+    polls until the batch finishes, then writes each result to its summary path.
+    Returns (success_count, error_count).
+    """
+    summarized = find_summarized(category)
+    success_count = 0
+    error_count = 0
+
+    # One request per transcript still to summarize, keyed by custom_id
+    pending = {}
+    request_lines = []
+    for transcript_info in transcripts:
+        episode_title = transcript_info['episode_title']
+        if summary_key(transcript_info['podcast_name'], episode_title) in summarized:
+            print(f"  Already exists, skipping: {episode_title}")
+            success_count += 1
+            continue
+
+        # Case-insensitive filesystems: a title differing only in case is the same file
+        summary_path = create_summary_path(category, transcript_info['podcast_name'], episode_title)
+        if summary_path.exists():
+            print(f"  Already exists, skipping: {episode_title}")
+            success_count += 1
+            continue
+
+        audio_url = transcript_audio_url(transcript_info['path'])
+        cached_summary = reuse_cached_summary(audio_url, summary_path, category, provider, model)
+        if cached_summary:
+            print(f"  Reused summary of same audio URL ({cached_summary}) for: {summary_path}")
+            success_count += 1
+            continue
+
+        transcript, truncated = load_transcript(transcript_info['path'], encoding, max_transcript_tokens)
+        if truncated:
+            print(f"  Warning: Transcript longer than {max_transcript_tokens} tokens, truncating: {episode_title}")
+
+        custom_id = str(len(pending))
+        pending[custom_id] = {**transcript_info, 'audio_url': audio_url}
+        request_lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_MESSAGE},
+                    {"role": "user", "content": f"{prompt}\n\nTranscript:\n{transcript}"}
+                ],
+                "max_tokens": SUMMARY_MAX_TOKENS,
+                "temperature": 0.3
+            }
+        }))
+
+    if not pending:
+        return success_count, error_count
+
+    async with create_llm_client(provider, config) as client:
+        # Re-uploading the input is harmless, so the upload may use the SDK's retries
+        batch_input = await client.with_options(max_retries=2).files.create(
+            file=("batch_input.jsonl", "\n".join(request_lines).encode('utf-8')),
+            purpose="batch"
+        )
+        batch = await submit_batch(client, batch_input.id)
+        print(f"\nSubmitted batch {batch.id} with {len(pending)} requests")
+
+        while batch.status not in BATCH_FINAL_STATUSES:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await retrieve_batch(client, batch.id)
+            counts = batch.request_counts
+            progress = f" ({counts.completed + counts.failed}/{counts.total})" if counts else ""
+            print(f"  Batch {batch.status}{progress}")
+
+        # Expired/cancelled batches still return the requests that finished
+        if batch.status != "completed":
+            log_error("3_summarize", f"Batch {batch.id} ended with status '{batch.status}'")
+            print(f"Warning: Batch {batch.id} ended with status '{batch.status}', saving any finished results")
+
+        output_text = ""
+        if batch.output_file_id:
+            output_text = await download_file_text(client, batch.output_file_id)
+
+    # Fan results out to their summary files
+    for line in output_text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        transcript_info = pending.pop(result['custom_id'], None)
+        if transcript_info is None:
+            continue
+
+        podcast_name = transcript_info['podcast_name']
+        episode_title = transcript_info['episode_title']
+        response = result.get('response') or {}
+        if response.get('status_code') != 200:
+            error = result.get('error') or response.get('body')
+            log_error("3_summarize", f"Failed to summarize {episode_title}: {error}")
+            print(f"  Error ({podcast_name} - {episode_title}): {error}")
+            error_count += 1
+            continue
+
+        summary = response['body']['choices'][0]['message']['content']
+        summary_path = create_summary_path(category, podcast_name, episode_title)
+        write_text_file(summary_path, format_summary(category, podcast_name, episode_title, provider, model, summary))
+        if transcript_info['audio_url']:
+            cache_store(transcript_info['audio_url'], summary_cache_model(category, provider, model), summary_path)
+        print(f"  Saved to: {summary_path}")
+        success_count += 1
+
+    # Requests that failed outright or never ran have no line in the output file
+    for transcript_info in pending.values():
+        log_error("3_summarize", f"No batch result for {transcript_info['episode_title']} "
+                                 f"(batch {batch.id}, error file {batch.error_file_id})")
+        error_count += 1
+
+    return success_count, error_count
+
+
 def main():
     parser = argparse.ArgumentParser(description="Summarize podcast transcripts")
     parser.add_argument(
@@ -170,13 +621,23 @@ def main():
         default=None,
         help="Override the model specified in .env"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit all transcripts as one OpenAI Batch API job (openai provider only; "
+             "about half the cost, results within 24 hours)"
+    )
     args = parser.parse_args()
 
     print(f"Podcast Summarization Script - Category: {args.category}")
     print("=" * 50)
 
     # Load configuration
-    config = load_env_vars()
+    try:
+        config = load_env_vars()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
 
     # Check for appropriate API key based on provider
     provider = config['llm_provider']
@@ -195,6 +656,10 @@ def main():
         print("Supported providers: openai, anthropic, deepinfra, openrouter")
         return
 
+    if args.batch and provider != "openai":
+        print(f"Error: --batch requires the openai provider (current: '{provider}')")
+        return
+
     # Load prompt templates
     try:
         templates = load_prompt_templates()
@@ -219,6 +684,13 @@ def main():
     print(f"Using provider: {provider}")
     print(f"Using model: {model}")
 
+    # Work out how much of each transcript fits the model's context
+    try:
+        encoding, max_transcript_tokens = transcript_token_budget(prompt, model, config)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
     # Get all transcripts
     transcripts = get_transcripts()
     if not transcripts:
@@ -228,77 +700,18 @@ def main():
 
     print(f"\nFound {len(transcripts)} transcripts to process")
 
-    # Process each transcript
-    success_count = 0
-    error_count = 0
-
-    for transcript_info in tqdm(transcripts, desc="Summarizing"):
-        podcast_name = transcript_info['podcast_name']
-        episode_title = transcript_info['episode_title']
-        transcript_path = transcript_info['path']
-
-        print(f"\nProcessing: {podcast_name} - {episode_title}")
-
-        try:
-            # Create summary path
-            summary_path = create_summary_path(category, podcast_name, episode_title)
-
-            # Skip if already summarized
-            if summary_path.exists():
-                print(f"  Already exists, skipping")
-                success_count += 1
-                continue
-
-            # Read transcript
-            transcript = read_text_file(transcript_path)
-
-            # Check if transcript is too long (truncate if needed)
-            max_chars = 100000  # Approx 100k chars
-            if len(transcript) > max_chars:
-                print(f"  Warning: Transcript too long ({len(transcript)} chars), truncating")
-                transcript = transcript[:max_chars]
-
-            # Generate summary based on provider
-            print(f"  Generating summary...")
-            if provider == "openai":
-                summary = summarize_with_openai(transcript, prompt, config['llm_key'], model)
-            elif provider == "anthropic":
-                summary = summarize_with_anthropic(transcript, prompt, config['llm_key'], model)
-            elif provider == "deepinfra":
-                summary = summarize_with_deepinfra(transcript, prompt, config['llm_key'], model)
-            elif provider == "openrouter":
-                summary = summarize_with_openrouter(transcript, prompt, config['openrouter_key'],
-                                                     config['openrouter_url'], model)
-            else:
-                print(f"  Error: Unknown provider '{provider}'")
-                log_error("3_summarize", f"Unknown provider: {provider}")
-                error_count += 1
-                continue
-
-            # Add metadata to summary
-            metadata_header = f"""# Summary Metadata
-Category: {category}
-Podcast: {podcast_name}
-Episode: {episode_title}
-Generated: {datetime.now().isoformat()}
-Model: {provider}/{model}
-
----
-
-"""
-            full_summary = metadata_header + summary
-
-            # Save summary
-            write_text_file(summary_path, full_summary)
-
-            print(f"  Saved to: {summary_path}")
-            success_count += 1
-
-        except Exception as e:
-            print(f"  Error: {str(e)}")
-            log_error("3_summarize", f"Failed to summarize {episode_title}: {str(e)}")
-            error_count += 1
-            continue
+    if args.batch:
+        # Submit everything as one batch job and wait for the results
+        success_count, error_count = asyncio.run(
+            summarize_batch(transcripts, prompt, category, provider, model, config, encoding,
+                            max_transcript_tokens)
+        )
+    else:
+        # Process transcripts concurrently (LLM calls are I/O-bound)
+        success_count, error_count = asyncio.run(
+            summarize_all(transcripts, prompt, category, provider, model, config, encoding,
+                          max_transcript_tokens)
+        )
 
     # Summary
     print("\n" + "=" * 50)
@@ -4,14 +4,34 @@ Windows-compatible with pathlib for all file operations.
 """
 
 from pathlib import Path
+import hashlib
+import json
+import logging
 import os
-from datetime import datetime
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from dotenv import load_dotenv
+from tenacity import wait_exponential
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
 
 
 def load_env_vars():
-    """Load API keys from .env file."""
+    """
+    Load API keys from .env file.
+    Raises ValueError for settings that would stall the pipeline.
+    """
     load_dotenv()
+    transcribe_concurrency = int(os.getenv('TRANSCRIBE_CONCURRENCY', 8))
+    if transcribe_concurrency < 1:
+        raise ValueError(f"TRANSCRIBE_CONCURRENCY must be at least 1 (got {transcribe_concurrency})")
     return {
         'deep_infra_key': os.getenv('DEEP_INFRA_API_KEY'),
         'openrouter_key': os.getenv('OPENROUTER_API_KEY'),
@@ -19,24 +39,81 @@ def load_env_vars():
         'openrouter_url': os.getenv('OPEN_ROUTER_URL', 'https://openrouter.ai/api/v1/chat/completions'),
         'max_episodes': int(os.getenv('MAX_EPISODES_PER_PODCAST', 10)),
         'transcription_model': os.getenv('TRANSCRIPTION_MODEL', 'openai/whisper-large-v3'),
+        'transcribe_concurrency': transcribe_concurrency,
         'summary_model': os.getenv('SUMMARY_MODEL', 'gpt-4o'),
+        'summary_context_tokens': int(os.getenv('SUMMARY_CONTEXT_TOKENS', 32000)),
     }
 
 
+# Characters not allowed in Windows filenames, mapped to '_' in one pass
+_INVALID_FILENAME_CHARS = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
+
+@lru_cache(maxsize=4096)
 def sanitize_filename(name):
     """
     Clean strings for valid Windows filenames.
     Removes invalid characters and limits length.
+    Cached, since podcast names repeat across every episode.
     """
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        name = name.replace(char, '_')
+    name = name.translate(_INVALID_FILENAME_CHARS)
     # Remove leading/trailing spaces and periods
     name = name.strip('. ')
     # Handle path length limits (Windows has 260 char limit)
     return name[:200]
 
 
+# Retry waits: exponential backoff unless the provider says how long to wait
+_backoff_wait = wait_exponential(multiplier=1, min=4, max=60)
+MAX_RETRY_AFTER = 300  # seconds
+
+
+def retry_after_seconds(error):
+    """
+    Seconds the API asked us to wait (Retry-After / retry-after-ms headers), or None.
+    Also checks the wrapped exception, since callers re-raise API errors with context.
+    """
+    for exc in (error, getattr(error, '__cause__', None)):
+        headers = getattr(getattr(exc, 'response', None), 'headers', None)
+        if not headers:
+            continue
+        try:
+            if 'retry-after-ms' in headers:
+                return float(headers['retry-after-ms']) / 1000
+            if 'retry-after' in headers:
+                value = headers['retry-after']
+                try:
+                    return float(value)
+                except ValueError:
+                    # HTTP-date form
+                    return (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def wait_retry_after(retry_state):
+    """Tenacity wait: honour the provider's Retry-After on 429s, else back off exponentially."""
+    delay = retry_after_seconds(retry_state.outcome.exception())
+    if delay is None:
+        return _backoff_wait(retry_state)
+    return min(max(delay, 0), MAX_RETRY_AFTER)
+
+
+# Folders already created this run, so repeat calls skip the mkdir syscalls
+_created_folders = set()
+_created_folders_lock = threading.Lock()
+
+
+def ensure_folder(folder):
+    """Create a folder (and parents) once per run; later calls are a set lookup."""
+    with _created_folders_lock:
+        if folder not in _created_folders:
+            folder.mkdir(parents=True, exist_ok=True)
+            _created_folders.add(folder)
+    return folder
+
+
 def create_transcript_path(podcast_name, episode_title):
     """
     Create full path for a transcript file.
@@ -44,7 +121,7 @@ def create_transcript_path(podcast_name, episode_title):
     """
     base_path = Path("transcripts")
     podcast_folder = base_path / sanitize_filename(podcast_name)
-    podcast_folder.mkdir(parents=True, exist_ok=True)
+    ensure_folder(podcast_folder)
     return podcast_folder / f"{sanitize_filename(episode_title)}.txt"
 
 
@@ -56,16 +133,67 @@ def create_summary_path(category, podcast_name, episode_title):
     base_path = Path("summaries")
     category_folder = base_path / sanitize_filename(category)
     podcast_folder = category_folder / sanitize_filename(podcast_name)
-    podcast_folder.mkdir(parents=True, exist_ok=True)
+    ensure_folder(podcast_folder)
     return podcast_folder / f"{sanitize_filename(episode_title)}_summary.txt"
 
 
+# errors.log stays open for the whole run; the handler serializes writes.
+# delay=True so the file is only created once something is logged.
+_error_handler = logging.FileHandler("errors.log", encoding='utf-8', delay=True)
+_error_handler.setFormatter(logging.Formatter('%(message)s'))
+_error_logger = logging.getLogger('podcast_pipeline')
+_error_logger.setLevel(logging.ERROR)
+_error_logger.addHandler(_error_handler)
+_error_logger.propagate = False
+
+
 def log_error(script_name, error_msg):
     """Consistent error logging with timestamp."""
-    log_path = Path("errors.log")
-    timestamp = datetime.now().isoformat()
-    with open(log_path, 'a', encoding='utf-8') as f:
-        f.write(f"[{timestamp}] {script_name}: {error_msg}\n")
+    _error_logger.error("[%s] %s: %s", datetime.now().isoformat(), script_name, error_msg)
+
+
+# Maps sha1(url|model) -> output file, so reruns skip work already done for a URL.
+# Transcription also stores audio content hashes here in place of the URL.
+URL_CACHE_PATH = Path("transcripts") / "_url_cache.sqlite3"
+
+_url_cache_db = None
+_url_cache_lock = threading.Lock()
+
+
+def _url_cache():
+    """Open the URL cache database on first use."""
+    global _url_cache_db
+    if _url_cache_db is None:
+        ensure_folder(URL_CACHE_PATH.parent)
+        _url_cache_db = sqlite3.connect(URL_CACHE_PATH, check_same_thread=False)
+        _url_cache_db.execute(
+            "CREATE TABLE IF NOT EXISTS cache (hash TEXT PRIMARY KEY, path TEXT, ts INTEGER)"
+        )
+    return _url_cache_db
+
+
+def _url_cache_key(url, model):
+    return hashlib.sha1(f"{url}|{model}".encode('utf-8')).hexdigest()
+
+
+def cache_lookup(url, model):
+    """Return the file previously produced for (url, model), if it still exists."""
+    with _url_cache_lock:
+        row = _url_cache().execute(
+            "SELECT path FROM cache WHERE hash = ?", (_url_cache_key(url, model),)
+        ).fetchone()
+    if row and Path(row[0]).exists():
+        return Path(row[0])
+    return None
+
+
+def cache_store(url, model, path):
+    """Record the file produced for (url, model)."""
+    with _url_cache_lock, _url_cache():
+        _url_cache().execute(
+            "INSERT OR REPLACE INTO cache (hash, path, ts) VALUES (?, ?, ?)",
+            (_url_cache_key(url, model), str(path), int(time.time()))
+        )
 
 
 def create_folder_structure(base_path, subfolders):
@@ -79,23 +207,44 @@ def create_folder_structure(base_path, subfolders):
 
 def read_text_file(file_path):
     """Read text file with UTF-8 encoding."""
+    return Path(file_path).read_text(encoding='utf-8')
+
+
+def read_text_file_bounded(file_path, max_chars):
+    """
+    Read at most max_chars characters from a UTF-8 text file.
+    Returns (content, truncated) without loading the rest of the file.
+    """
     path = Path(file_path)
     with open(path, 'r', encoding='utf-8') as f:
-        return f.read()
+        content = f.read(max_chars + 1)
+    if len(content) > max_chars:
+        return content[:max_chars], True
+    return content, False
 
 
 def write_text_file(file_path, content):
     """Write text file with UTF-8 encoding."""
     path = Path(file_path)
-    # Ensure parent directory exists
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # Ensure parent directory exists (once per run)
+    ensure_folder(path.parent)
+    path.write_text(content, encoding='utf-8')
+
+
+def write_json_file(file_path, data):
+    """Write data as indented UTF-8 JSON, using orjson when it is installed."""
+    path = Path(file_path)
+    # Ensure parent directory exists (once per run)
+    ensure_folder(path.parent)
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
 
 
 def get_audio_filename(url):
     """Extract filename from audio URL."""
-    from urllib.parse import urlparse
+    from urllib.parse import urlparse, unquote
     parsed = urlparse(url)
-    filename = Path(parsed.path).name
+    filename = unquote(Path(parsed.path).name)
     return sanitize_filename(filename)